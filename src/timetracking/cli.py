@@ -1,24 +1,51 @@
 """CLI interface for time tracking."""
 
-from datetime import datetime
-from typing import Optional
+from datetime import datetime, timedelta
+from functools import cache
+from itertools import compress
+from typing import TYPE_CHECKING, Callable, Optional
 
 import typer
-from rich.console import Console
-from rich.table import Table
-from rich import box
 
 from .session import SessionManager
-from .storage import Storage
+from .utils import commit_count
+
+if TYPE_CHECKING:
+    from rich.console import Console
 
 app = typer.Typer(help="Simple time tracking with git integration")
-console = Console()
+
+# Session fields shown by `track log`
+LOG_COLUMNS = ("session_id", "start_time", "duration_minutes", "description", "commits")
+
+
+@app.callback()
+def main(ctx: typer.Context):
+    """Simple time tracking with git integration."""
+    # One SessionManager per invocation, shared by whichever command runs
+    ctx.obj = SessionManager()
+
+
+@cache
+def get_console() -> "Console":
+    """Return the shared rich console, importing rich on first use.
+
+    rich is imported lazily so `hook-commit`, which runs on every git commit
+    and prints nothing, doesn't pay for it at startup.
+    """
+    from rich.console import Console
+
+    return Console()
 
 
 def format_datetime(iso_string: str) -> str:
     """Format ISO datetime string for display."""
     if not iso_string:
         return ""
+    # Timestamps written by SessionManager are plain isoformat() output, so
+    # the display form is just a slice of the string itself.
+    if len(iso_string) in (19, 26) and iso_string[10] == "T":
+        return f"{iso_string[:10]} {iso_string[11:19]}"
     dt = datetime.fromisoformat(iso_string)
     return dt.strftime("%Y-%m-%d %H:%M:%S")
 
@@ -34,10 +61,31 @@ def format_duration(minutes: float) -> str:
     return f"{days:.1f}d"
 
 
+def start_filter(today: bool, week: bool) -> Callable[[str], bool]:
+    """Return a predicate for start times today or within the last 7 days."""
+    # ISO timestamps order the same as strings, so compare them directly
+    # rather than parsing each row
+    now = datetime.now()
+    if week:
+        cutoff = (now - timedelta(days=7)).isoformat()
+        return lambda start_time: cutoff < start_time
+    target = now.date().isoformat()
+    return lambda start_time: start_time[:10] == target
+
+
+def filter_sessions(sessions: list[dict], today: bool, week: bool) -> list[dict]:
+    """Keep sessions started today or within the last 7 days."""
+    if not (today or week):
+        return sessions
+    matches = start_filter(today, week)
+    return [s for s in sessions if matches(s["start_time"])]
+
+
 @app.command()
-def start(description: str):
+def start(ctx: typer.Context, description: str):
     """Start a new work session."""
-    manager = SessionManager()
+    console = get_console()
+    manager = ctx.obj
     try:
         session = manager.start_session(description)
         console.print(f"[green]✓[/green] Started session #{session['session_id']}: {description}")
@@ -47,9 +95,10 @@ def start(description: str):
 
 
 @app.command()
-def stop():
+def stop(ctx: typer.Context):
     """Stop the active session."""
-    manager = SessionManager()
+    console = get_console()
+    manager = ctx.obj
     try:
         session = manager.stop_session()
         duration = format_duration(session["duration_minutes"])
@@ -60,8 +109,7 @@ def stop():
         # Show commits if any
         commits = session.get("commits", "")
         if commits:
-            commit_count = len(commits.split("|"))
-            console.print(f"  Commits: {commit_count}")
+            console.print(f"  Commits: {commit_count(commits)}")
 
     except ValueError as e:
         console.print(f"[red]✗[/red] {e}", style="red")
@@ -69,9 +117,10 @@ def stop():
 
 
 @app.command()
-def pause():
+def pause(ctx: typer.Context):
     """Pause the active session."""
-    manager = SessionManager()
+    console = get_console()
+    manager = ctx.obj
     try:
         session = manager.pause_session()
         console.print(f"[yellow]⏸[/yellow] Paused session #{session['session_id']}")
@@ -81,9 +130,10 @@ def pause():
 
 
 @app.command()
-def resume():
+def resume(ctx: typer.Context):
     """Resume a paused session."""
-    manager = SessionManager()
+    console = get_console()
+    manager = ctx.obj
     try:
         session = manager.resume_session()
         console.print(f"[green]▶[/green] Resumed session #{session['session_id']}")
@@ -93,9 +143,10 @@ def resume():
 
 
 @app.command()
-def note(text: str):
+def note(ctx: typer.Context, text: str):
     """Add a note to the active session."""
-    manager = SessionManager()
+    console = get_console()
+    manager = ctx.obj
     try:
         session = manager.add_note(text)
         console.print(f"[green]✓[/green] Note added to session #{session['session_id']}")
@@ -105,9 +156,10 @@ def note(text: str):
 
 
 @app.command()
-def status():
+def status(ctx: typer.Context):
     """Show the current session status."""
-    manager = SessionManager()
+    console = get_console()
+    manager = ctx.obj
     status = manager.get_session_status()
 
     if not status["active"]:
@@ -135,13 +187,14 @@ def status():
 
 @app.command()
 def log(
+    ctx: typer.Context,
     limit: int = typer.Option(10, "--limit", "-n", help="Number of sessions to show"),
     today: bool = typer.Option(False, "--today", help="Show only today's sessions"),
     week: bool = typer.Option(False, "--week", help="Show this week's sessions"),
 ):
     """View recent work sessions."""
-    storage = Storage()
-    sessions = storage.get_sessions()
+    console = get_console()
+    sessions = ctx.obj.storage.get_sessions(columns=LOG_COLUMNS)
 
     if not sessions:
         console.print("[yellow]No sessions recorded yet[/yellow]")
@@ -149,18 +202,7 @@ def log(
 
     # Filter by date if requested
     if today or week:
-        now = datetime.now()
-        filtered = []
-        for s in sessions:
-            try:
-                start = datetime.fromisoformat(s["start_time"])
-                if today and start.date() == now.date():
-                    filtered.append(s)
-                elif week and (now - start).days < 7:
-                    filtered.append(s)
-            except (ValueError, KeyError):
-                continue
-        sessions = filtered
+        sessions = filter_sessions(sessions, today, week)
 
     # Apply limit
     sessions = sessions[:limit]
@@ -170,6 +212,9 @@ def log(
         return
 
     # Create table
+    from rich import box
+    from rich.table import Table
+
     table = Table(box=box.ROUNDED)
     table.add_column("ID", style="cyan")
     table.add_column("Start", style="blue")
@@ -179,63 +224,55 @@ def log(
 
     for session in sessions:
         session_id = session.get("session_id", "")
-        start_time = format_datetime(session.get("start_time", ""))
-        duration = format_duration(float(session.get("duration_minutes", 0)))
+        start_time = format_datetime(session["start_time"])
+        duration = format_duration(session["duration_minutes"])
         description = session.get("description", "")
-        commits = session.get("commits", "")
-        commit_count = str(len(commits.split("|"))) if commits else "0"
+        commits = str(commit_count(session.get("commits", "")))
 
         # Truncate description if too long
         if len(description) > 50:
             description = description[:47] + "..."
 
-        table.add_row(session_id, start_time, duration, description, commit_count)
+        table.add_row(session_id, start_time, duration, description, commits)
 
     console.print(table)
 
 
 @app.command()
 def report(
+    ctx: typer.Context,
     today: bool = typer.Option(False, "--today", help="Report for today"),
     week: bool = typer.Option(False, "--week", help="Report for this week"),
 ):
     """Generate a summary report of work sessions."""
-    storage = Storage()
-    sessions = storage.get_sessions()
-
-    if not sessions:
+    console = get_console()
+    # Only a few fields are aggregated, so read them as columns rather than
+    # building a dict per session
+    columns = ctx.obj.storage.get_session_columns()
+    durations = columns["duration_minutes"]
+    commits = columns["commits"]
+
+    if not durations:
         console.print("[yellow]No sessions recorded yet[/yellow]")
         return
 
     # Filter by date if requested
-    now = datetime.now()
-    filtered = []
     period_name = "all time"
 
     if today or week:
-        for s in sessions:
-            try:
-                start = datetime.fromisoformat(s["start_time"])
-                if today and start.date() == now.date():
-                    filtered.append(s)
-                elif week and (now - start).days < 7:
-                    filtered.append(s)
-            except (ValueError, KeyError):
-                continue
-        sessions = filtered
+        keep = list(map(start_filter(today, week), columns["start_time"]))
+        durations = list(compress(durations, keep))
+        commits = list(compress(commits, keep))
         period_name = "today" if today else "this week"
 
-    if not sessions:
+    if not durations:
         console.print(f"[yellow]No sessions found for {period_name}[/yellow]")
         return
 
     # Calculate statistics
-    total_sessions = len(sessions)
-    total_minutes = sum(float(s.get("duration_minutes", 0)) for s in sessions)
-    total_commits = sum(
-        len(s.get("commits", "").split("|")) if s.get("commits") else 0
-        for s in sessions
-    )
+    total_sessions = len(durations)
+    total_minutes = sum(durations)
+    total_commits = sum(map(commit_count, commits))
 
     # Display report
     console.print(f"\n[bold]Work Report ({period_name})[/bold]\n")
@@ -260,6 +297,8 @@ def install_hook(
     """Install git post-commit hook to track commits automatically."""
     from .git_hook import install_git_hook
 
+    console = get_console()
+
     try:
         path = install_git_hook(global_install=global_install, repo_path=repo_path)
         if global_install:
@@ -274,9 +313,9 @@ def install_hook(
 
 
 @app.command(name="hook-commit")
-def hook_commit(commit_hash: str, commit_message: str):
+def hook_commit(ctx: typer.Context, commit_hash: str, commit_message: str):
     """Internal command called by git post-commit hook."""
-    manager = SessionManager()
+    manager = ctx.obj
     result = manager.add_commit(commit_hash, commit_message)
 
     # This runs silently - only output if there's an issue
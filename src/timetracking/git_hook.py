@@ -25,6 +25,68 @@ fi
 '''
 
 
+def _find_git_dir(repo: Path) -> Path:
+    """
+    Locate the git directory of a repository.
+
+    Plain repos, worktrees and submodules are resolved from the filesystem;
+    git itself is only asked for anything else (bare repos, subdirectories)
+    or when a .git file points somewhere that doesn't exist.
+
+    Raises:
+        ValueError: If repo is not a git repository
+    """
+    git_dir = repo / ".git"
+    if git_dir.is_dir():
+        return git_dir
+
+    # Worktrees and submodules have a .git file pointing at their git dir
+    if git_dir.is_file():
+        first_line = git_dir.read_text().partition("\n")[0].strip()
+        if first_line.startswith("gitdir:"):
+            pointer = Path(first_line.split(":", 1)[1].strip())
+            if not pointer.is_absolute():
+                pointer = repo / pointer
+            if pointer.is_dir():
+                return pointer
+
+    try:
+        result = subprocess.run(
+            ["git", "rev-parse", "--git-dir"],
+            cwd=repo,
+            capture_output=True,
+            text=True,
+            check=True,
+        )
+    except subprocess.CalledProcessError:
+        raise ValueError(f"Not a git repository: {repo}")
+
+    git_dir = Path(result.stdout.strip())
+    if not git_dir.is_absolute():
+        git_dir = repo / git_dir
+    return git_dir
+
+
+def _find_hooks_dir(repo: Path) -> Path:
+    """
+    Locate the directory git runs a repository's hooks from.
+
+    A worktree's git dir only holds its per-worktree state; its ``commondir``
+    file points at the shared git dir, which is where hooks live.
+
+    Raises:
+        ValueError: If repo is not a git repository
+    """
+    git_dir = _find_git_dir(repo)
+    commondir_file = git_dir / "commondir"
+    if commondir_file.is_file():
+        common_dir = Path(commondir_file.read_text().strip())
+        if not common_dir.is_absolute():
+            common_dir = git_dir / common_dir
+        git_dir = common_dir
+    return git_dir / "hooks"
+
+
 def install_git_hook(global_install: bool = False, repo_path: Optional[str] = None) -> Path:
     """
     Install the post-commit hook.
@@ -40,10 +102,8 @@ def install_git_hook(global_install: bool = False, repo_path: Optional[str] = No
         ValueError: If git is not available or repo is invalid
         IOError: If hook installation fails
     """
-    # Check if git is available
-    try:
-        subprocess.run(["git", "--version"], capture_output=True, check=True)
-    except (subprocess.CalledProcessError, FileNotFoundError):
+    # Check if git is available (a PATH lookup, no need to spawn git)
+    if shutil.which("git") is None:
         raise ValueError("Git is not installed or not in PATH")
 
     hook_content = get_hook_script()
@@ -87,26 +147,7 @@ def install_git_hook(global_install: bool = False, repo_path: Optional[str] = No
             # Use current directory
             repo = Path.cwd()
 
-        # Find .git directory
-        git_dir = repo / ".git"
-
-        if not git_dir.exists() or not git_dir.is_dir():
-            # Maybe it's a worktree or bare repo
-            try:
-                result = subprocess.run(
-                    ["git", "rev-parse", "--git-dir"],
-                    cwd=repo,
-                    capture_output=True,
-                    text=True,
-                    check=True,
-                )
-                git_dir = Path(result.stdout.strip())
-                if not git_dir.is_absolute():
-                    git_dir = repo / git_dir
-            except subprocess.CalledProcessError:
-                raise ValueError(f"Not a git repository: {repo}")
-
-        hooks_dir = git_dir / "hooks"
+        hooks_dir = _find_hooks_dir(repo)
         hooks_dir.mkdir(parents=True, exist_ok=True)
 
         hook_file = hooks_dir / "post-commit"
@@ -162,18 +203,7 @@ def uninstall_git_hook(global_uninstall: bool = False, repo_path: Optional[str]
             repo = Path.cwd()
 
         try:
-            result = subprocess.run(
-                ["git", "rev-parse", "--git-dir"],
-                cwd=repo,
-                capture_output=True,
-                text=True,
-                check=True,
-            )
-            git_dir = Path(result.stdout.strip())
-            if not git_dir.is_absolute():
-                git_dir = repo / git_dir
-
-            hook_file = git_dir / "hooks" / "post-commit"
+            hook_file = _find_hooks_dir(repo) / "post-commit"
             if hook_file.exists():
                 hook_file.unlink()
                 return True
@@ -1,10 +1,16 @@
 """Advanced reporting and analytics for time tracking data."""
 
+from bisect import bisect_left
 from datetime import datetime, timedelta
-from typing import Dict, List, Optional
+from typing import Dict, List, Optional, Tuple
 from collections import defaultdict
+from functools import cached_property
+from operator import itemgetter
 
 from .storage import Storage
+from .utils import commit_count, parse_commits
+
+WEEKDAY_NAMES = ("Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday")
 
 
 class ReportGenerator:
@@ -14,27 +20,67 @@ class ReportGenerator:
         """Initialize report generator with storage backend."""
         self.storage = storage or Storage()
 
+    @cached_property
+    def _sessions(self) -> List[Dict]:
+        """All sessions, read from storage once and shared by every report."""
+        return self.storage.get_sessions()
+
+    @cached_property
+    def _timeline(self) -> List[Dict]:
+        """Sessions sorted oldest first by start time, for range lookups."""
+        # Storage returns newest first, so this is a single reversed run
+        return sorted(self._sessions, key=itemgetter("start_time"))
+
+    @cached_property
+    def _columns(self) -> Dict[str, List]:
+        """Session fields laid out column-wise, aligned with ``_timeline``."""
+        sessions = self._timeline
+        start_times = [s["start_time"] for s in sessions]
+        return {
+            "start_time": start_times,
+            "day": [start[:10] for start in start_times],
+            "duration_minutes": [s["duration_minutes"] for s in sessions],
+            "commit_count": [commit_count(s.get("commits", "")) for s in sessions],
+        }
+
+    @cached_property
+    def _by_id(self) -> Dict[str, Dict]:
+        """Sessions keyed by session_id; the most recent wins on duplicates."""
+        return {s.get("session_id"): s for s in reversed(self._sessions)}
+
+    def _window(self, start: str, end: Optional[str] = None) -> slice:
+        """Locate sessions starting in ``[start, end)`` by bisecting the sorted start times."""
+        # ISO timestamps order the same as strings, and a date string sorts
+        # before every timestamp on that day
+        start_times = self._columns["start_time"]
+        low = bisect_left(start_times, start)
+        high = bisect_left(start_times, end) if end is not None else len(start_times)
+        return slice(low, high)
+
+    def _select(self, window: slice) -> Tuple[List[Dict], float, int]:
+        """Return the sessions in ``window`` (newest first) with their total minutes and commits."""
+        columns = self._columns
+        return (
+            self._timeline[window][::-1],
+            sum(columns["duration_minutes"][window]),
+            sum(columns["commit_count"][window]),
+        )
+
+    def invalidate(self):
+        """Drop cached session data after the underlying storage changes."""
+        self.__dict__.pop("_sessions", None)
+        self.__dict__.pop("_timeline", None)
+        self.__dict__.pop("_columns", None)
+        self.__dict__.pop("_by_id", None)
+
     def get_daily_summary(self, date: Optional[datetime] = None) -> Dict:
         """Get summary for a specific day."""
         if date is None:
             date = datetime.now()
 
-        sessions = self.storage.get_sessions()
-        daily_sessions = []
-
-        for session in sessions:
-            try:
-                start = datetime.fromisoformat(session["start_time"])
-                if start.date() == date.date():
-                    daily_sessions.append(session)
-            except (ValueError, KeyError):
-                continue
-
-        total_minutes = sum(float(s.get("duration_minutes", 0)) for s in daily_sessions)
-        total_commits = sum(
-            len(s.get("commits", "").split("|")) if s.get("commits") else 0
-            for s in daily_sessions
-        )
+        day = date.date()
+        window = self._window(day.isoformat(), (day + timedelta(days=1)).isoformat())
+        daily_sessions, total_minutes, total_commits = self._select(window)
 
         return {
             "date": date.date().isoformat(),
@@ -54,32 +100,18 @@ class ReportGenerator:
         monday = (start_date - timedelta(days=days_since_monday)).date()
         sunday = monday + timedelta(days=6)
 
-        sessions = self.storage.get_sessions()
-        weekly_sessions = []
-
-        for session in sessions:
-            try:
-                start = datetime.fromisoformat(session["start_time"])
-                if monday <= start.date() <= sunday:
-                    weekly_sessions.append(session)
-            except (ValueError, KeyError):
-                continue
-
-        total_minutes = sum(float(s.get("duration_minutes", 0)) for s in weekly_sessions)
-        total_commits = sum(
-            len(s.get("commits", "").split("|")) if s.get("commits") else 0
-            for s in weekly_sessions
-        )
+        window = self._window(monday.isoformat(), (sunday + timedelta(days=1)).isoformat())
+        weekly_sessions, total_minutes, total_commits = self._select(window)
 
-        # Group by day
+        # Group by day, mapping each date of the week to its name so no
+        # timestamps need parsing
+        week_days = {
+            (monday + timedelta(days=offset)).isoformat(): name
+            for offset, name in enumerate(WEEKDAY_NAMES)
+        }
         by_day = defaultdict(list)
-        for session in weekly_sessions:
-            try:
-                start = datetime.fromisoformat(session["start_time"])
-                day_name = start.strftime("%A")
-                by_day[day_name].append(session)
-            except (ValueError, KeyError):
-                continue
+        for session, day in zip(weekly_sessions, reversed(self._columns["day"][window])):
+            by_day[week_days[day]].append(session)
 
         return {
             "week_start": monday.isoformat(),
@@ -92,44 +124,20 @@ class ReportGenerator:
 
     def get_commit_details(self, session_id: int) -> List[Dict]:
         """Extract commit details from a session."""
-        sessions = self.storage.get_sessions()
-        session = None
-
-        for s in sessions:
-            if s.get("session_id") == str(session_id):
-                session = s
-                break
-
+        session = self._by_id.get(str(session_id))
         if not session:
             return []
 
-        commits_str = session.get("commits", "")
-        if not commits_str:
-            return []
-
-        commit_entries = commits_str.split("|")
-        commits = []
-
-        for entry in commit_entries:
-            if ":" in entry:
-                hash_part, message = entry.split(":", 1)
-                commits.append({"hash": hash_part.strip(), "message": message.strip()})
-
-        return commits
+        return [
+            {"hash": hash_part, "message": message}
+            for hash_part, message in parse_commits(session.get("commits", ""))
+        ]
 
     def get_productivity_stats(self, days: int = 30) -> Dict:
         """Get productivity statistics for the last N days."""
-        sessions = self.storage.get_sessions()
-        cutoff_date = datetime.now() - timedelta(days=days)
-
-        recent_sessions = []
-        for session in sessions:
-            try:
-                start = datetime.fromisoformat(session["start_time"])
-                if start >= cutoff_date:
-                    recent_sessions.append(session)
-            except (ValueError, KeyError):
-                continue
+        cutoff = (datetime.now() - timedelta(days=days)).isoformat()
+        window = self._window(cutoff)
+        recent_sessions, total_minutes, total_commits = self._select(window)
 
         if not recent_sessions:
             return {
@@ -142,20 +150,8 @@ class ReportGenerator:
                 "active_days": 0,
             }
 
-        total_minutes = sum(float(s.get("duration_minutes", 0)) for s in recent_sessions)
-        total_commits = sum(
-            len(s.get("commits", "").split("|")) if s.get("commits") else 0
-            for s in recent_sessions
-        )
-
         # Count unique active days
-        active_days = set()
-        for session in recent_sessions:
-            try:
-                start = datetime.fromisoformat(session["start_time"])
-                active_days.add(start.date())
-            except (ValueError, KeyError):
-                continue
+        active_days = set(self._columns["day"][window])
 
         return {
             "period_days": days,
@@ -169,16 +165,16 @@ class ReportGenerator:
 
     def export_to_dict(self) -> List[Dict]:
         """Export all sessions as a list of dictionaries."""
-        return self.storage.get_sessions()
+        return list(self._sessions)
 
     def get_longest_sessions(self, limit: int = 5) -> List[Dict]:
         """Get the longest work sessions."""
-        sessions = self.storage.get_sessions()
+        sessions = self._sessions
 
         # Sort by duration
         sorted_sessions = sorted(
             sessions,
-            key=lambda s: float(s.get("duration_minutes", 0)),
+            key=itemgetter("duration_minutes"),
             reverse=True,
         )
 
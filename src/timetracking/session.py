@@ -4,6 +4,10 @@ from datetime import datetime, timedelta
 from typing import Optional
 
 from .storage import Storage
+from .utils import commit_count
+
+# Durations are tracked in whole seconds, computed by integer timedelta division
+_ONE_SECOND = timedelta(seconds=1)
 
 
 class SessionManager:
@@ -13,142 +17,162 @@ class SessionManager:
         """Initialize session manager with storage backend."""
         self.storage = storage or Storage()
 
+    def _with_commits(self, active: dict) -> dict:
+        """Merge commits from the append-only commit log into the session."""
+        commits = [active.get("commits", "")] + self.storage.load_active_commits()
+        active["commits"] = "|".join(c for c in commits if c)
+        return active
+
     def start_session(self, description: str) -> dict:
         """Start a new work session."""
-        # Check if there's already an active session
-        active = self.storage.load_active_session()
-        if active and not active.get("paused", False):
-            raise ValueError(
-                f"Session #{active['session_id']} is already active. "
-                "Stop or pause it first."
-            )
-
-        # Create new session
-        session_id = self.storage.get_next_session_id()
-        now = datetime.now()
-
-        session_data = {
-            "session_id": session_id,
-            "start_time": now.isoformat(),
-            "end_time": "",
-            "duration_minutes": 0,
-            "description": description,
-            "commits": "",
-            "notes": "",
-            "paused": False,
-            "pause_time": None,
-            "total_pause_duration": 0,
-        }
-
-        self.storage.save_active_session(session_data)
+        # Held until the new session is on disk, so a stop in another
+        # process can't remove it halfway through
+        with self.storage.locked():
+            # Check if there's already an active session
+            active = self.storage.load_active_session()
+            if active and not active.get("paused", False):
+                raise ValueError(
+                    f"Session #{active['session_id']} is already active. "
+                    "Stop or pause it first."
+                )
+
+            # Create new session
+            session_id = self.storage.get_next_session_id()
+            now = datetime.now()
+
+            session_data = {
+                "session_id": session_id,
+                "start_time": now.isoformat(),
+                "end_time": "",
+                "duration_minutes": 0,
+                "description": description,
+                "commits": "",
+                "notes": "",
+                "paused": False,
+                "pause_time": None,
+                "total_pause_duration": 0,
+            }
+
+            # Drop commits left over from a session this one replaces
+            self.storage.clear_active_commits()
+            self.storage.save_active_session(session_data)
         return session_data
 
     def stop_session(self) -> dict:
         """Stop the active session and save to CSV."""
-        active = self.storage.load_active_session()
-        if not active:
-            raise ValueError("No active session to stop.")
-
-        # Calculate duration
-        start_time = datetime.fromisoformat(active["start_time"])
-        end_time = datetime.now()
-
-        # Account for paused time
-        total_pause = active.get("total_pause_duration", 0)
-        if active.get("paused") and active.get("pause_time"):
-            pause_start = datetime.fromisoformat(active["pause_time"])
-            total_pause += (end_time - pause_start).total_seconds() / 60
-
-        duration = (end_time - start_time).total_seconds() / 60 - total_pause
-
-        # Update session data
-        active["end_time"] = end_time.isoformat()
-        active["duration_minutes"] = round(duration, 2)
-
-        # Remove pause-related fields before saving to CSV
-        csv_data = {k: v for k, v in active.items()
-                    if k not in ["paused", "pause_time", "total_pause_duration"]}
-
-        # Save to CSV and clear active session
-        self.storage.append_session_to_csv(csv_data)
-        self.storage.clear_active_session()
+        # Held until the session file is removed, so a concurrent note or
+        # pause can't write it back afterwards
+        with self.storage.locked():
+            active = self.storage.load_active_session()
+            if not active:
+                raise ValueError("No active session to stop.")
+
+            # Calculate duration
+            start_time = datetime.fromisoformat(active["start_time"])
+            end_time = datetime.now()
+
+            # Account for paused time (in seconds)
+            total_pause = active.get("total_pause_duration", 0)
+            if active.get("paused") and active.get("pause_time"):
+                pause_start = datetime.fromisoformat(active["pause_time"])
+                total_pause += (end_time - pause_start) // _ONE_SECOND
+
+            duration = ((end_time - start_time) // _ONE_SECOND - total_pause) / 60
+
+            # Update session data
+            self._with_commits(active)
+            active["end_time"] = end_time.isoformat()
+            active["duration_minutes"] = round(duration, 2)
+
+            # Remove pause-related fields before saving to CSV
+            csv_data = {k: v for k, v in active.items()
+                        if k not in ["paused", "pause_time", "total_pause_duration"]}
+
+            # Save to CSV and clear active session
+            self.storage.append_session_to_csv(csv_data)
+            self.storage.sync()
+            self.storage.clear_active_session()
 
         return csv_data
 
     def pause_session(self) -> dict:
         """Pause the active session."""
-        active = self.storage.load_active_session()
-        if not active:
-            raise ValueError("No active session to pause.")
+        def pause(active: dict):
+            if active.get("paused"):
+                raise ValueError("Session is already paused.")
 
-        if active.get("paused"):
-            raise ValueError("Session is already paused.")
+            active["paused"] = True
+            active["pause_time"] = datetime.now().isoformat()
 
-        active["paused"] = True
-        active["pause_time"] = datetime.now().isoformat()
-
-        self.storage.save_active_session(active)
+        active = self.storage.update_active_session(pause)
+        if not active:
+            raise ValueError("No active session to pause.")
         return active
 
     def resume_session(self) -> dict:
         """Resume a paused session."""
-        active = self.storage.load_active_session()
-        if not active:
-            raise ValueError("No active session to resume.")
-
-        if not active.get("paused"):
-            raise ValueError("Session is not paused.")
+        def resume(active: dict):
+            if not active.get("paused"):
+                raise ValueError("Session is not paused.")
 
-        # Calculate pause duration
-        pause_start = datetime.fromisoformat(active["pause_time"])
-        pause_duration = (datetime.now() - pause_start).total_seconds() / 60
+            # Calculate pause duration in seconds
+            pause_start = datetime.fromisoformat(active["pause_time"])
+            pause_duration = (datetime.now() - pause_start) // _ONE_SECOND
 
-        active["total_pause_duration"] = active.get("total_pause_duration", 0) + pause_duration
-        active["paused"] = False
-        active["pause_time"] = None
+            active["total_pause_duration"] = active.get("total_pause_duration", 0) + pause_duration
+            active["paused"] = False
+            active["pause_time"] = None
 
-        self.storage.save_active_session(active)
+        active = self.storage.update_active_session(resume)
+        if not active:
+            raise ValueError("No active session to resume.")
         return active
 
     def add_note(self, note: str) -> dict:
         """Add a note to the active session."""
-        active = self.storage.load_active_session()
+        def append_note(active: dict):
+            # Append note with semicolon separator
+            existing_notes = active.get("notes", "")
+            if existing_notes:
+                active["notes"] = f"{existing_notes}; {note}"
+            else:
+                active["notes"] = note
+
+        active = self.storage.update_active_session(append_note)
         if not active:
             raise ValueError("No active session to add note to.")
-
-        # Append note with semicolon separator
-        existing_notes = active.get("notes", "")
-        if existing_notes:
-            active["notes"] = f"{existing_notes}; {note}"
-        else:
-            active["notes"] = note
-
-        self.storage.save_active_session(active)
         return active
 
-    def add_commit(self, commit_hash: str, commit_message: str) -> dict:
-        """Add a git commit to the active session."""
-        active = self.storage.load_active_session()
-        if not active:
-            # If no active session, we can't add the commit
+    def add_commit(self, commit_hash: str, commit_message: str) -> Optional[str]:
+        """
+        Add a git commit to the active session.
+
+        Returns:
+            The recorded ``hash:message`` entry, or None if no session is active
+        """
+        # Called from the git hook on every commit; most commits happen with
+        # no session running, so bail out on a stat before opening anything
+        if not self.storage.has_active_session():
             return None
 
         # Format: hash:message
         commit_entry = f"{commit_hash}:{commit_message}"
 
-        # Append commit with pipe separator
-        existing_commits = active.get("commits", "")
-        if existing_commits:
-            active["commits"] = f"{existing_commits}|{commit_entry}"
-        else:
-            active["commits"] = commit_entry
-
-        self.storage.save_active_session(active)
-        return active
+        # Appended to the commit log; joined with pipes when the session stops.
+        # The lock keeps a stop from reading and removing the log between the
+        # check and the append, which would drop the commit
+        with self.storage.locked():
+            if not self.storage.has_active_session():
+                return None
+            self.storage.append_active_commit(commit_entry)
+        return commit_entry
 
     def get_active_session(self) -> Optional[dict]:
         """Get the currently active session."""
-        return self.storage.load_active_session()
+        active = self.storage.load_active_session()
+        if not active:
+            return None
+        return self._with_commits(active)
 
     def get_session_status(self) -> dict:
         """Get detailed status of the active session."""
@@ -160,18 +184,15 @@ class SessionManager:
         now = datetime.now()
 
         # Calculate elapsed time
+        # Pause time is kept in seconds; convert to minutes only at the end
         total_pause = active.get("total_pause_duration", 0)
         if active.get("paused") and active.get("pause_time"):
             pause_start = datetime.fromisoformat(active["pause_time"])
-            current_pause = (now - pause_start).total_seconds() / 60
+            current_pause = (now - pause_start) // _ONE_SECOND
         else:
             current_pause = 0
 
-        elapsed = (now - start_time).total_seconds() / 60 - total_pause - current_pause
-
-        # Count commits
-        commits = active.get("commits", "")
-        commit_count = len(commits.split("|")) if commits else 0
+        elapsed = ((now - start_time) // _ONE_SECOND - total_pause - current_pause) / 60
 
         return {
             "active": True,
@@ -180,6 +201,9 @@ class SessionManager:
             "start_time": active["start_time"],
             "elapsed_minutes": round(elapsed, 2),
             "paused": active.get("paused", False),
-            "commit_count": commit_count,
+            "commit_count": (
+                commit_count(active.get("commits", ""))
+                + len(self.storage.load_active_commits())
+            ),
             "notes": active.get("notes", ""),
         }
\ No newline at end of file
@@ -1,14 +1,283 @@
 """Storage layer for persisting time tracking data."""
 
 import csv
+import io
 import json
+import mmap
+import os
+import tempfile
+import weakref
+from contextlib import contextmanager
 from datetime import datetime
+from itertools import islice, zip_longest
 from pathlib import Path
-from typing import Optional
+from typing import BinaryIO, Callable, Iterable, Iterator, Optional, Sequence, Union
+
+from .utils import parse_iso
+
+try:
+    import fcntl
+except ImportError:  # Windows has no flock; updates there are unlocked
+    fcntl = None
+
+try:
+    import orjson
+except ImportError:  # Optional speedup; the stdlib encoder is used without it
+    orjson = None
+
+# CSV columns in file order, and the value written when a session lacks one
+_FIELDS = (
+    "session_id",
+    "start_time",
+    "end_time",
+    "duration_minutes",
+    "description",
+    "commits",
+    "notes",
+)
+_DEFAULTS = ("", "", "", 0, "", "", "")
+
+# The header line new CSV files start with, in csv.writer's default dialect
+_HEADER_BYTES = (",".join(_FIELDS) + "\r\n").encode()
+
+# Compact separators for the active session JSON, which is rewritten on
+# every change
+_JSON_SEPARATORS = (",", ":")
+
+# orjson.JSONDecodeError subclasses json.JSONDecodeError, so callers catch
+# the stdlib error either way
+_loads = orjson.loads if orjson is not None else json.loads
+
+# How many rows from the end update_session_in_csv rewrites in place before
+# falling back to rewriting the whole file
+_TAIL_UPDATE_ROWS = 64
+
+# CSV text at least this long is split directly when it holds no quotes
+_SPLIT_ROWS_SIZE = 1 << 20
+
+# Buffered CSV rows are written out once they exceed this many characters
+_WRITE_BUFFER_SIZE = 64 * 1024
+
+
+def _dumps(data: dict) -> bytes:
+    """Encode ``data`` as compact JSON bytes, using orjson when installed."""
+    if orjson is not None:
+        return orjson.dumps(data)
+    return json.dumps(data, separators=_JSON_SEPARATORS).encode()
+
+
+def _write_json_atomically(path: Path, data: dict):
+    """
+    Atomically replace the JSON file at ``path``.
+
+    The JSON is written to a temporary file that is renamed over the old one,
+    so a crash mid-write leaves the previous contents intact instead of a
+    truncated file.
+    """
+    tmp_file = path.with_suffix(".json.tmp")
+    tmp_file.write_bytes(_dumps(data))
+    os.replace(tmp_file, path)
+
+
+def _load_session(raw: bytes) -> dict:
+    """
+    Decode an active session file, upgrading fields written by older versions.
+
+    total_pause_duration used to be stored as float minutes and is now whole
+    seconds. New files only ever hold an int there, so a float marks a session
+    started before the change.
+    """
+    session_data = _loads(raw)
+    pause = session_data.get("total_pause_duration")
+    if isinstance(pause, float):
+        session_data["total_pause_duration"] = round(pause * 60)
+    return session_data
+
+
+@contextmanager
+def _mapped(f: BinaryIO) -> Iterator[Union[mmap.mmap, bytes]]:
+    """
+    Map an open file read-only, so it can be searched and sliced without
+    reading it into memory first.
+
+    mmap can't map an empty file, so empty bytes stand in for one.
+    """
+    if os.fstat(f.fileno()).st_size == 0:
+        yield b""
+        return
+    with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+        yield mapped
+
+
+def _row_starts_reversed(data: Union[mmap.mmap, bytes]) -> Iterator[int]:
+    """
+    Yield the byte offsets at which CSV data rows start, newest row first.
+
+    Quoted fields can contain newlines, but always hold an even number of
+    quote characters, so a newline only ends a row when an even number of
+    quotes follow it.
+    """
+    end = len(data)
+    stop = end
+    quotes = 0
+
+    newline = data.rfind(b"\n", 0, stop)
+    while newline != -1:
+        quotes += data[newline + 1:stop].count(b'"')
+        if quotes % 2 == 0 and newline + 1 < end:
+            yield newline + 1
+        stop = newline
+        newline = data.rfind(b"\n", 0, stop)
+
+
+def _parse_rows(data: bytes) -> list[list[str]]:
+    """Parse raw CSV bytes into rows."""
+    return list(csv.reader(io.TextIOWrapper(io.BytesIO(data), newline="")))
+
+
+def _split_rows(text: str) -> list[list[str]]:
+    """
+    Parse CSV text into rows.
+
+    Without any quote characters a CSV can't hold quoted fields, embedded
+    newlines or escaped commas, so large files like that are split on
+    newlines and commas directly, which is faster than csv.reader. Blank
+    lines are skipped either way.
+    """
+    if (
+        len(text) >= _SPLIT_ROWS_SIZE
+        and '"' not in text
+        and text.count("\r") == text.count("\r\n")
+    ):
+        return [line.split(",") for line in text.replace("\r\n", "\n").split("\n") if line]
+    return [row for row in csv.reader(io.StringIO(text, newline="")) if row]
+
+
+def _first_row(data: bytes) -> list[str]:
+    """Parse the first CSV row in ``data``, or return [] if there is none."""
+    return next(csv.reader(io.TextIOWrapper(io.BytesIO(data), newline="")), [])
+
+
+def _last_row(data: Union[mmap.mmap, bytes]) -> list[str]:
+    """Return the fields of the last CSV data row, or [] if there is none."""
+    offset = next(_row_starts_reversed(data), None)
+    return [] if offset is None else _first_row(data[offset:])
+
+
+def _row_from(session_data: dict) -> tuple:
+    """Build a CSV row from a session dict in column order."""
+    get = session_data.get
+    return tuple(get(field, default) for field, default in zip(_FIELDS, _DEFAULTS))
+
+
+def _valid_start(row: list[str], index: int) -> bool:
+    """Check that a CSV row has a parseable ISO start time at ``index``."""
+    try:
+        parse_iso(row[index])
+    except (IndexError, ValueError):
+        return False
+    return True
+
+
+def _to_minutes(value: Optional[str]) -> float:
+    """Convert a stored duration to float minutes, treating bad values as 0."""
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return 0.0
+
+
+def _sessions_from_rows(
+    header: list[str],
+    rows: Iterable[list[str]],
+    columns: Optional[Sequence[str]] = None,
+) -> list[dict]:
+    """
+    Build session dicts from raw CSV rows, keeping only ``columns`` if given.
+
+    Rows whose start time doesn't parse are dropped before any dict is built:
+    validating once here lets every filter and report use start_time directly
+    without guarding each comparison.
+    """
+    try:
+        start = header.index("start_time")
+    except ValueError:
+        return []
+
+    if columns is None:
+        return [dict(zip(header, row)) for row in rows if _valid_start(row, start)]
+
+    fields = []
+    for column in columns:
+        if column not in header:
+            raise ValueError(f"Unknown session column: {column}")
+        fields.append((column, header.index(column)))
+    return [
+        {column: row[i] for column, i in fields if i < len(row)}
+        for row in rows
+        if _valid_start(row, start)
+    ]
+
+
+class _CsvAppender:
+    """Buffers rows appended to a CSV file and writes them through one long-lived handle."""
+
+    def __init__(self, path: Path):
+        """Initialize an empty buffer for the CSV file at ``path``."""
+        self.path = path
+        self._buffer = io.StringIO()
+        self._writer = csv.writer(self._buffer)
+        self._fh = None
+        self._pid = os.getpid()
+
+    def _reset_if_forked(self):
+        """Drop the buffer and handle inherited from a parent process."""
+        if self._pid != os.getpid():
+            self._buffer = io.StringIO()
+            self._writer = csv.writer(self._buffer)
+            self._fh = None
+            self._pid = os.getpid()
+
+    def writerows(self, rows: Iterable[tuple]):
+        """Buffer rows, writing the buffer out once it grows large."""
+        self._reset_if_forked()
+        self._writer.writerows(rows)
+        if self._buffer.tell() >= _WRITE_BUFFER_SIZE:
+            self.flush()
+
+    def flush(self):
+        """Write any buffered rows to the file."""
+        if self._pid != os.getpid() or not self._buffer.tell():
+            return
+
+        if self._fh is None:
+            self._fh = open(self.path, "a", newline="")
+        self._fh.write(self._buffer.getvalue())
+        self._fh.flush()
+        self._buffer.seek(0)
+        self._buffer.truncate()
+
+    def close(self):
+        """Flush buffered rows and close the file handle."""
+        self.flush()
+        if self._fh is not None:
+            self._fh.close()
+            self._fh = None
 
 
 class Storage:
-    """Handles CSV and JSON storage for time tracking sessions."""
+    """
+    Handles CSV and JSON storage for time tracking sessions.
+
+    Appended CSV rows are buffered and written out by flush(), which every read
+    does first; close() (or leaving a ``with`` block, or the Storage being
+    garbage collected or the interpreter exiting) flushes too.
+
+    None of these writes are fsynced: the active session and its commit log
+    change often and only matter until the session is stopped. sync(), called
+    once when a session is stopped, fsyncs the CSV and the data directory so
+    completed sessions survive a crash.
+    """
 
     def __init__(self, data_dir: Optional[Path] = None):
         """Initialize storage with data directory."""
@@ -16,133 +285,412 @@ class Storage:
             data_dir = Path.home() / ".timetrack"
 
         self.data_dir = data_dir
-        self.data_dir.mkdir(parents=True, exist_ok=True)
-
         self.csv_file = self.data_dir / "sessions.csv"
         self.active_session_file = self.data_dir / "active_session.json"
+        self.active_commits_file = self.data_dir / "active_commits.log"
+        self.active_lock_file = self.data_dir / "active_session.lock"
+
+        # Nothing touches the disk until the first write, so constructing a
+        # Storage (done by every CLI command) stays cheap
+        self._dir_ready = False
+        self._csv_ready = False
+
+        # Next session id, read from the last CSV row on first use and then
+        # kept up to date as sessions are appended
+        self._next_id: Optional[int] = None
+        self._header: Optional[list[str]] = None
+
+        self._appender = _CsvAppender(self.csv_file)
+        weakref.finalize(self, self._appender.close)
+
+    def __enter__(self) -> "Storage":
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def flush(self):
+        """Write buffered CSV rows to disk."""
+        self._appender.flush()
 
-        # Initialize CSV file with headers if it doesn't exist
-        if not self.csv_file.exists():
+    def sync(self):
+        """Flush buffered writes and fsync the CSV file and the data directory."""
+        self.flush()
+        try:
+            with open(self.csv_file, "rb+") as f:
+                os.fsync(f.fileno())
+        except FileNotFoundError:
+            return
+
+        # Directories can't be opened for fsync on Windows
+        if hasattr(os, "O_DIRECTORY"):
+            dir_fd = os.open(self.data_dir, os.O_RDONLY | os.O_DIRECTORY)
+            try:
+                os.fsync(dir_fd)
+            finally:
+                os.close(dir_fd)
+
+    def close(self):
+        """Flush buffered CSV rows and release the CSV file handle."""
+        self._appender.close()
+
+    def _ensure_data_dir(self):
+        """Create the data directory if it doesn't exist."""
+        if not self._dir_ready:
+            self.data_dir.mkdir(parents=True, exist_ok=True)
+            self._dir_ready = True
+
+    def _ensure_csv(self):
+        """Create the CSV file with headers if it doesn't exist."""
+        if not self._csv_ready:
+            self._ensure_data_dir()
             self._initialize_csv()
+            self._csv_ready = True
 
     def _initialize_csv(self):
-        """Create CSV file with headers."""
-        with open(self.csv_file, "w", newline="") as f:
-            writer = csv.writer(f)
-            writer.writerow([
-                "session_id",
-                "start_time",
-                "end_time",
-                "duration_minutes",
-                "description",
-                "commits",
-                "notes"
-            ])
+        """Create CSV file with headers, leaving an existing file alone."""
+        try:
+            f = open(self.csv_file, "xb")
+        except FileExistsError:
+            return
+
+        # The file holds no sessions yet, so ids start from 1
+        self._next_id = 1
+        self._header = None
+        with f:
+            f.write(_HEADER_BYTES)
+
+    @contextmanager
+    def locked(self) -> Iterator[None]:
+        """
+        Hold an exclusive lock on the active session for the ``with`` block.
+
+        Starting, stopping and update_active_session() all run under it, so a
+        note or pause racing a stop can't write the session back after it has
+        been removed. The lock isn't reentrant.
+        """
+        self._ensure_data_dir()
+        # The session file itself is replaced on every write, so the lock has
+        # to live on a file that stays put
+        with open(self.active_lock_file, "a") as lock:
+            if fcntl is not None:
+                fcntl.flock(lock, fcntl.LOCK_EX)
+            yield
 
     def save_active_session(self, session_data: dict):
         """Save the currently active session to JSON."""
-        with open(self.active_session_file, "w") as f:
-            json.dump(session_data, f, indent=2)
+        self._ensure_data_dir()
+        _write_json_atomically(self.active_session_file, session_data)
+
+    def has_active_session(self) -> bool:
+        """Check for an active session with a single stat, without reading it."""
+        return self.active_session_file.exists()
 
     def load_active_session(self) -> Optional[dict]:
         """Load the active session if one exists."""
-        if not self.active_session_file.exists():
-            return None
-
         try:
-            with open(self.active_session_file, "r") as f:
-                return json.load(f)
+            return _load_session(self.active_session_file.read_bytes())
         except (json.JSONDecodeError, IOError):
             return None
 
+    def update_active_session(self, update: Callable[[dict], None]) -> Optional[dict]:
+        """
+        Apply ``update`` to the active session in a single locked read-modify-write.
+
+        The locked() lock is held while the session is read, mutated in place
+        by ``update`` and atomically replaced, so concurrent callers (e.g. the
+        git hook, or a stop in another process) can't interleave. Exceptions
+        raised by ``update`` leave the file untouched.
+
+        Returns:
+            The updated session, or None if no session is active
+        """
+        if not self.active_session_file.exists():
+            return None
+
+        with self.locked():
+            try:
+                session_data = _load_session(self.active_session_file.read_bytes())
+            except (FileNotFoundError, json.JSONDecodeError):
+                return None
+
+            update(session_data)
+            _write_json_atomically(self.active_session_file, session_data)
+
+        return session_data
+
     def clear_active_session(self):
-        """Remove the active session file."""
-        if self.active_session_file.exists():
-            self.active_session_file.unlink()
+        """Remove the active session file and its commit log."""
+        self.active_session_file.unlink(missing_ok=True)
+        self.clear_active_commits()
+
+    def append_active_commit(self, commit_entry: str):
+        """
+        Append a commit entry to the active session's commit log.
+
+        Commits are kept in an append-only sidecar file rather than in the
+        active session JSON, so recording one costs a single small write no
+        matter how many commits the session already has. Each entry is stored
+        JSON-encoded on its own line since commit messages can span lines.
+        """
+        self._ensure_data_dir()
+        with open(self.active_commits_file, "a") as f:
+            f.write(json.dumps(commit_entry) + "\n")
+
+    def load_active_commits(self) -> list[str]:
+        """Load the commit entries logged for the active session."""
+        try:
+            with open(self.active_commits_file, "r") as f:
+                return [json.loads(line) for line in f if line.strip()]
+        except FileNotFoundError:
+            return []
+
+    def clear_active_commits(self):
+        """Remove the active session's commit log."""
+        self.active_commits_file.unlink(missing_ok=True)
 
     def append_session_to_csv(self, session_data: dict):
         """Append a completed session to the CSV file."""
-        with open(self.csv_file, "a", newline="") as f:
-            writer = csv.writer(f)
-            writer.writerow([
-                session_data.get("session_id", ""),
-                session_data.get("start_time", ""),
-                session_data.get("end_time", ""),
-                session_data.get("duration_minutes", 0),
-                session_data.get("description", ""),
-                session_data.get("commits", ""),
-                session_data.get("notes", "")
-            ])
+        self.append_sessions([session_data])
+
+    def append_sessions(self, sessions: Iterable[dict]):
+        """
+        Append completed sessions to the CSV file.
+
+        All rows go into the write buffer with a single writerows() call, so
+        appending many sessions at once (e.g. importing history) costs one
+        write rather than one per session.
+        """
+        sessions = list(sessions)
+        if not sessions:
+            return
+
+        self._ensure_csv()
+        # Learn the next id before adding rows, which needn't be in id order
+        # (e.g. imported history) and would hide the highest id from a read
+        # of the last row
+        if self._next_id is None:
+            self._next_id = self._read_next_session_id()
+        self._appender.writerows(map(_row_from, sessions))
+
+        try:
+            highest = max(int(session["session_id"]) for session in sessions)
+            self._next_id = max(self._next_id, highest + 1)
+        except (KeyError, TypeError, ValueError):
+            self._next_id = None
+
+    def _update_recent_row(self, session_id: str, row: tuple) -> bool:
+        """
+        Replace the row for ``session_id`` in place if it is one of the most recent.
+
+        Only the last ``_TAIL_UPDATE_ROWS`` rows are searched. The file is
+        rewritten from the matching row onwards, so updating a recent session
+        doesn't depend on the size of the file.
+
+        Returns:
+            True if the row was replaced, False if it wasn't found near the end
+        """
+        with open(self.csv_file, "rb+") as f:
+            with _mapped(f) as data:
+                end = len(data)
+                next_start = end
+                for offset in islice(_row_starts_reversed(data), _TAIL_UPDATE_ROWS):
+                    fields = _first_row(data[offset:next_start])
+                    if fields and fields[0] == session_id:
+                        break
+                    next_start = offset
+                else:
+                    return False
+
+                # Keep the rows after the matching one as raw bytes
+                suffix = data[next_start:end]
+
+            buffer = io.BytesIO()
+            text = io.TextIOWrapper(buffer, newline="")
+            csv.writer(text).writerow(row)
+            text.flush()
+
+            f.seek(offset)
+            f.write(buffer.getvalue() + suffix)
+            f.truncate()
+            return True
 
     def update_session_in_csv(self, session_data: dict):
         """Update an existing session in the CSV (used for active session updates)."""
-        # Read all rows
-        rows = []
+        self._appender.flush()
         session_id = session_data.get("session_id")
-        found = False
+        new_row = _row_from(session_data)
 
-        if self.csv_file.exists():
-            with open(self.csv_file, "r", newline="") as f:
-                reader = csv.DictReader(f)
-                headers = reader.fieldnames
+        # The session being updated is almost always one of the most recent
+        try:
+            if self._update_recent_row(str(session_id), new_row):
+                return
+        except FileNotFoundError:
+            self.append_session_to_csv(session_data)
+            return
+
+        # Otherwise stream every row into a temporary file, substituting the
+        # updated one, so memory use doesn't grow with the file
+        session_id = str(session_id)
+        found = False
+        with open(self.csv_file, "r", newline="") as src, tempfile.NamedTemporaryFile(
+            "w", newline="", dir=self.data_dir, suffix=".csv.tmp", delete=False
+        ) as tmp:
+            try:
+                reader = csv.reader(src)
+                writer = csv.writer(tmp)
+                writer.writerow(next(reader, _FIELDS))
                 for row in reader:
-                    if row["session_id"] == str(session_id):
-                        # Update this row
-                        rows.append({
-                            "session_id": session_data.get("session_id", ""),
-                            "start_time": session_data.get("start_time", ""),
-                            "end_time": session_data.get("end_time", ""),
-                            "duration_minutes": session_data.get("duration_minutes", 0),
-                            "description": session_data.get("description", ""),
-                            "commits": session_data.get("commits", ""),
-                            "notes": session_data.get("notes", "")
-                        })
+                    if row and row[0] == session_id:
+                        row = new_row
                         found = True
-                    else:
-                        rows.append(row)
+                    writer.writerow(row)
+            except BaseException:
+                os.unlink(tmp.name)
+                raise
 
         # If not found, append instead
         if not found:
+            os.unlink(tmp.name)
             self.append_session_to_csv(session_data)
             return
 
-        # Write back all rows
-        with open(self.csv_file, "w", newline="") as f:
-            writer = csv.DictWriter(f, fieldnames=headers)
-            writer.writeheader()
-            writer.writerows(rows)
+        # The append handle would keep writing to the replaced file
+        self._appender.close()
+        os.replace(tmp.name, self.csv_file)
+
+    def get_sessions(
+        self, limit: Optional[int] = None, columns: Optional[Sequence[str]] = None
+    ) -> list[dict]:
+        """
+        Retrieve sessions from CSV, optionally limited to most recent.
+
+        Args:
+            limit: Maximum number of sessions to return
+            columns: CSV fields to include in each session, or None for all
+
+        Raises:
+            ValueError: If ``columns`` names a field the CSV doesn't have
+        """
+        self._appender.flush()
+        try:
+            if limit:
+                sessions = self._tail_sessions(limit, columns)
+            else:
+                header, rows = self._read_rows()
 
-    def get_sessions(self, limit: Optional[int] = None) -> list[dict]:
-        """Retrieve sessions from CSV, optionally limited to most recent."""
-        if not self.csv_file.exists():
+                # Return most recent first
+                sessions = _sessions_from_rows(header, reversed(rows), columns)
+        except FileNotFoundError:
             return []
 
-        sessions = []
+        # Coerce durations once here so callers can sum/sort them directly
+        if columns is None or "duration_minutes" in columns:
+            for session in sessions:
+                session["duration_minutes"] = _to_minutes(session.get("duration_minutes"))
+
+        return sessions
+
+    def get_session_columns(self) -> dict[str, list]:
+        """
+        Retrieve all sessions as columns, oldest first.
+
+        Returns a list per CSV field instead of a dict per session, for callers
+        that aggregate over one or two fields. Rows are filtered and durations
+        coerced the same way as get_sessions().
+        """
+        self._appender.flush()
+        try:
+            header, rows = self._read_rows()
+        except FileNotFoundError:
+            return {field: [] for field in _FIELDS}
+
+        try:
+            start = header.index("start_time")
+        except ValueError:
+            return {field: [] for field in header}
+        rows = [row for row in rows if _valid_start(row, start)]
+
+        if not rows:
+            return {field: [] for field in header}
+
+        # Transpose rows into columns, padding any short rows
+        columns = dict(zip(header, map(list, zip_longest(*rows, fillvalue=""))))
+        if "duration_minutes" in columns:
+            columns["duration_minutes"] = list(map(_to_minutes, columns["duration_minutes"]))
+        return columns
+
+    def _read_rows(self) -> tuple[list[str], list[list[str]]]:
+        """Read the whole CSV, returning its header and data rows."""
         with open(self.csv_file, "r", newline="") as f:
-            reader = csv.DictReader(f)
-            sessions = list(reader)
+            rows = _split_rows(f.read())
+        header = rows.pop(0) if rows else []
+        return header, rows
 
-        # Return most recent first
-        sessions.reverse()
+    def _tail_sessions(self, limit: int, columns: Optional[Sequence[str]] = None) -> list[dict]:
+        """
+        Read the ``limit`` most recent valid sessions from the end of the CSV.
 
-        if limit:
-            return sessions[:limit]
-        return sessions
+        Only the rows needed are read and parsed; rows dropped for a malformed
+        start time are made up by reading further back.
+        """
+        sessions = []
+        with open(self.csv_file, "rb") as f, _mapped(f) as data:
+            header = self._read_header(data)
+            starts = _row_starts_reversed(data)
+            end = len(data)
+
+            while len(sessions) < limit:
+                wanted = limit - len(sessions)
+                offsets = list(islice(starts, wanted))
+                if not offsets:
+                    break
+
+                rows = _parse_rows(data[offsets[-1]:end])
+                sessions.extend(_sessions_from_rows(header, reversed(rows), columns))
+                end = offsets[-1]
+
+                if len(offsets) < wanted:
+                    break
+
+        return sessions[:limit]
+
+    def _read_header(self, data: bytes) -> list[str]:
+        """Return the CSV header fields, read once and cached."""
+        if self._header is None:
+            self._header = _first_row(data[:data.find(b"\n") + 1 or len(data)])
+        return self._header
 
     def get_next_session_id(self) -> int:
         """Get the next available session ID."""
-        sessions = self.get_sessions()
-        if not sessions:
+        if self._next_id is None:
+            self._next_id = self._read_next_session_id()
+        return self._next_id
+
+    def _read_next_session_id(self) -> int:
+        """Work out the next session ID from the CSV file."""
+        self._appender.flush()
+        try:
+            with open(self.csv_file, "rb") as f, _mapped(f) as data:
+                last_row = _last_row(data)
+        except FileNotFoundError:
+            return 1
+        if not last_row:
             return 1
 
-        # Get max session_id
-        max_id = 0
-        for session in sessions:
-            try:
-                session_id = int(session.get("session_id", 0))
-                if session_id > max_id:
-                    max_id = session_id
-            except (ValueError, TypeError):
-                continue
+        # Sessions are appended in id order, so the last row holds the highest
+        # id and only the tail of the file needs reading
+        try:
+            return int(last_row[0]) + 1
+        except ValueError:
+            pass
+
+        # Otherwise scan every id. Read them straight from the file rather than
+        # via get_sessions(), which skips rows with a malformed start time
+        # whose ids are still taken.
+        _, rows = self._read_rows()
+        ids = [row[0] for row in rows if row]
 
-        return max_id + 1
\ No newline at end of file
+        # Filtering on isdecimal() keeps the conversion and max in C rather
+        # than a Python loop with a try/except per row
+        return max(map(int, filter(str.isdecimal, ids)), default=0) + 1
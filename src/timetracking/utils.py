@@ -0,0 +1,29 @@
+"""Shared helpers for working with stored session values."""
+
+import re
+from datetime import datetime
+from functools import lru_cache
+
+# One "hash:message" entry of a pipe-separated commits field; entries without
+# a colon don't match and are skipped
+_COMMIT_RE = re.compile(r"([^:|]*):([^|]*)")
+
+
+@lru_cache(maxsize=8192)
+def parse_iso(iso_string: str) -> datetime:
+    """Parse an ISO timestamp, memoized since reports re-read the same values."""
+    return datetime.fromisoformat(iso_string)
+
+
+def commit_count(commits: str) -> int:
+    """Count entries in a pipe-separated commits field without splitting it."""
+    return commits.count("|") + 1 if commits else 0
+
+
+@lru_cache(maxsize=1024)
+def parse_commits(commits: str) -> tuple[tuple[str, str], ...]:
+    """Split a commits field into stripped ``(hash, message)`` pairs, memoized."""
+    return tuple(
+        (match.group(1).strip(), match.group(2).strip())
+        for match in _COMMIT_RE.finditer(commits)
+    )
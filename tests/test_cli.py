@@ -0,0 +1,74 @@
+"""Tests for CLI formatting helpers."""
+
+import os
+import subprocess
+import sys
+import tempfile
+from datetime import datetime
+from pathlib import Path
+
+import pytest
+from typer.testing import CliRunner
+
+import timetracking
+from timetracking.cli import app, format_datetime
+
+
+@pytest.mark.parametrize(
+    "iso_string",
+    [
+        "2025-09-30T10:15:30.123456",
+        "2025-09-30T10:15:30",
+        "2025-09-30T10:15:30+02:00",
+        "2025-09-30T10:15:30.123456-05:30",
+        "2025-09-30 10:15:30",
+    ],
+)
+def test_format_datetime_matches_fromisoformat(iso_string):
+    """Test that the slicing fast path and the parsing fallback agree."""
+    expected = datetime.fromisoformat(iso_string).strftime("%Y-%m-%d %H:%M:%S")
+    assert format_datetime(iso_string) == expected == "2025-09-30 10:15:30"
+
+
+def test_format_datetime_empty():
+    """Test that a missing timestamp formats as an empty string."""
+    assert format_datetime("") == ""
+
+
+def test_session_lifecycle_through_cli(monkeypatch):
+    """Test a session's lifecycle through the CLI, with data under a temporary home."""
+    runner = CliRunner()
+    with tempfile.TemporaryDirectory() as tmpdir:
+        monkeypatch.setenv("HOME", tmpdir)
+
+        result = runner.invoke(app, ["start", "CLI work"])
+        assert result.exit_code == 0, result.output
+        assert "Started session #1: CLI work" in result.output
+
+        result = runner.invoke(app, ["hook-commit", "abc123", "Add CLI test"])
+        assert result.exit_code == 0, result.output
+        assert result.output == ""
+
+        result = runner.invoke(app, ["stop"])
+        assert result.exit_code == 0, result.output
+        assert "Stopped session #1" in result.output
+        assert "Commits: 1" in result.output
+
+        result = runner.invoke(app, ["log"])
+        assert result.exit_code == 0, result.output
+        assert "CLI work" in result.output
+
+        result = runner.invoke(app, ["report"])
+        assert result.exit_code == 0, result.output
+        assert "Total Sessions: 1" in result.output
+        assert "Total Commits: 1" in result.output
+
+        assert (Path(tmpdir) / ".timetrack" / "sessions.csv").exists()
+
+    # hook-commit runs on every git commit, so importing the CLI mustn't load rich
+    env = dict(os.environ, PYTHONPATH=str(Path(timetracking.__file__).parents[1]))
+    result = subprocess.run(
+        [sys.executable, "-c", "import sys, timetracking.cli; print('rich' in sys.modules)"],
+        env=env, capture_output=True, text=True, check=True,
+    )
+    assert result.stdout.strip() == "False"
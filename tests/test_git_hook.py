@@ -0,0 +1,107 @@
+"""Tests for git hook installation."""
+
+import os
+import shutil
+import subprocess
+import tempfile
+from pathlib import Path
+
+import pytest
+
+from timetracking.git_hook import install_git_hook, uninstall_git_hook
+
+requires_git = pytest.mark.skipif(shutil.which("git") is None, reason="git is not installed")
+
+
+@pytest.fixture
+def tmp_dir():
+    """Create a temporary directory outside any git repository."""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        yield Path(tmpdir).resolve()
+
+
+def git(*args, cwd):
+    """Run a git command with a fixed identity."""
+    env = dict(
+        os.environ,
+        GIT_AUTHOR_NAME="Test",
+        GIT_AUTHOR_EMAIL="test@example.com",
+        GIT_COMMITTER_NAME="Test",
+        GIT_COMMITTER_EMAIL="test@example.com",
+    )
+    return subprocess.run(
+        ["git", *args], cwd=cwd, env=env, capture_output=True, text=True, check=True
+    ).stdout.strip()
+
+
+@requires_git
+def test_install_hook_in_git_directory(tmp_dir):
+    """Test installing into a repository with a .git directory."""
+    (tmp_dir / ".git").mkdir()
+
+    hook_file = install_git_hook(repo_path=str(tmp_dir))
+
+    assert hook_file == tmp_dir / ".git" / "hooks" / "post-commit"
+    assert "track hook-commit" in hook_file.read_text()
+    assert uninstall_git_hook(repo_path=str(tmp_dir))
+    assert not hook_file.exists()
+
+
+@requires_git
+def test_install_hook_in_worktree_uses_common_dir(tmp_dir):
+    """Test that a worktree's hook goes in the main repository's hooks dir."""
+    main = tmp_dir / "main"
+    worktree_git_dir = main / ".git" / "worktrees" / "feature"
+    worktree_git_dir.mkdir(parents=True)
+    (worktree_git_dir / "commondir").write_text("../..\n")
+    worktree = tmp_dir / "feature"
+    worktree.mkdir()
+    (worktree / ".git").write_text(f"gitdir: {worktree_git_dir}\n")
+
+    hook_file = install_git_hook(repo_path=str(worktree))
+
+    assert hook_file.resolve() == main / ".git" / "hooks" / "post-commit"
+    assert not (worktree_git_dir / "hooks").exists()
+
+
+@requires_git
+def test_install_hook_in_submodule(tmp_dir):
+    """Test that a submodule's relative gitdir pointer is followed."""
+    module_git_dir = tmp_dir / ".git" / "modules" / "sub"
+    module_git_dir.mkdir(parents=True)
+    submodule = tmp_dir / "sub"
+    submodule.mkdir()
+    (submodule / ".git").write_text("gitdir: ../.git/modules/sub\n")
+
+    hook_file = install_git_hook(repo_path=str(submodule))
+
+    assert hook_file.resolve() == module_git_dir / "hooks" / "post-commit"
+
+
+@requires_git
+def test_install_hook_rejects_missing_gitdir(tmp_dir):
+    """Test that a .git file pointing nowhere isn't treated as a repository."""
+    repo = tmp_dir / "repo"
+    repo.mkdir()
+    (repo / ".git").write_text("gitdir: ../nowhere/x\n")
+
+    with pytest.raises(ValueError, match="Not a git repository"):
+        install_git_hook(repo_path=str(repo))
+
+    assert not (tmp_dir / "nowhere").exists()
+    assert not uninstall_git_hook(repo_path=str(repo))
+
+
+@requires_git
+def test_install_hook_matches_git_hooks_path(tmp_dir):
+    """Test against git's own idea of where a real worktree's hooks live."""
+    main = tmp_dir / "main"
+    main.mkdir()
+    git("init", "-q", cwd=main)
+    git("commit", "-q", "--allow-empty", "-m", "Initial", cwd=main)
+    git("worktree", "add", "-q", str(tmp_dir / "feature"), cwd=main)
+
+    hook_file = install_git_hook(repo_path=str(tmp_dir / "feature"))
+
+    hooks_path = Path(git("rev-parse", "--path-format=absolute", "--git-path", "hooks", cwd=tmp_dir / "feature"))
+    assert hook_file.resolve() == hooks_path.resolve() / "post-commit"
@@ -0,0 +1,206 @@
+"""Tests for report generation."""
+
+import tempfile
+from datetime import datetime, timedelta
+from pathlib import Path
+
+import pytest
+
+from timetracking.reports import ReportGenerator
+from timetracking.storage import Storage
+
+
+@pytest.fixture
+def temp_storage():
+    """Create a temporary storage instance."""
+    with tempfile.TemporaryDirectory() as tmpdir, Storage(data_dir=Path(tmpdir)) as storage:
+        yield storage
+
+
+def add_sessions(storage, *sessions):
+    """Append sessions given as ``(session_id, start_time, minutes, commits)`` tuples."""
+    storage.append_sessions(
+        {
+            "session_id": session_id,
+            "start_time": start_time,
+            "end_time": start_time,
+            "duration_minutes": minutes,
+            "commits": commits,
+        }
+        for session_id, start_time, minutes, commits in sessions
+    )
+
+
+def session_ids(sessions):
+    """Return the session ids of ``sessions`` as ints."""
+    return [int(s["session_id"]) for s in sessions]
+
+
+def test_daily_summary_excludes_next_midnight(temp_storage):
+    """Test that a session at 00:00:00 the next day belongs to that day."""
+    add_sessions(
+        temp_storage,
+        (1, "2025-09-29T23:59:59", 5, ""),
+        (2, "2025-09-30T00:00:00", 10, "a1:First"),
+        (3, "2025-09-30T12:30:00.250000", 20, "b2:Second|c3:Third"),
+        (4, "2025-10-01T00:00:00", 40, "d4:Fourth"),
+    )
+
+    summary = ReportGenerator(temp_storage).get_daily_summary(datetime(2025, 9, 30, 15))
+
+    assert summary["date"] == "2025-09-30"
+    assert session_ids(summary["sessions"]) == [3, 2]
+    assert summary["session_count"] == 2
+    assert summary["total_minutes"] == 30
+    assert summary["total_commits"] == 3
+
+
+def test_daily_summary_empty_day(temp_storage):
+    """Test a day without sessions."""
+    add_sessions(temp_storage, (1, "2025-09-29T10:00:00", 5, ""))
+
+    summary = ReportGenerator(temp_storage).get_daily_summary(datetime(2025, 9, 30))
+
+    assert summary["sessions"] == []
+    assert summary["total_minutes"] == 0
+    assert summary["total_commits"] == 0
+
+
+def test_weekly_summary_spans_monday_to_sunday(temp_storage):
+    """Test that the week runs from Monday 00:00 up to the following Monday."""
+    add_sessions(
+        temp_storage,
+        (1, "2025-09-28T23:59:59", 1, ""),
+        (2, "2025-09-29T00:00:00", 2, "a1:Start"),
+        (3, "2025-10-01T09:00:00", 4, ""),
+        (4, "2025-10-05T23:59:59", 8, "b2:End|c3:Late"),
+        (5, "2025-10-06T00:00:00", 16, ""),
+    )
+
+    # Thursday, so the week has to be found by walking back to Monday
+    summary = ReportGenerator(temp_storage).get_weekly_summary(datetime(2025, 10, 2, 18))
+
+    assert summary["week_start"] == "2025-09-29"
+    assert summary["week_end"] == "2025-10-05"
+    assert summary["session_count"] == 3
+    assert summary["total_minutes"] == 14
+    assert summary["total_commits"] == 3
+
+
+def test_weekly_summary_groups_by_weekday_name(temp_storage):
+    """Test that sessions are grouped under their weekday, newest first."""
+    add_sessions(
+        temp_storage,
+        (1, "2025-09-29T08:00:00", 1, ""),
+        (2, "2025-09-29T14:00:00", 1, ""),
+        (3, "2025-10-01T09:00:00", 1, ""),
+        (4, "2025-10-05T23:59:59", 1, ""),
+    )
+
+    summary = ReportGenerator(temp_storage).get_weekly_summary(datetime(2025, 9, 29))
+
+    assert list(summary["days"]) == ["Sunday", "Wednesday", "Monday"]
+    assert session_ids(summary["days"]["Monday"]) == [2, 1]
+    assert session_ids(summary["days"]["Wednesday"]) == [3]
+    assert session_ids(summary["days"]["Sunday"]) == [4]
+
+
+def test_weekly_summary_handles_out_of_order_rows(temp_storage):
+    """Test that rows appended out of start-time order still land in the right day."""
+    add_sessions(
+        temp_storage,
+        (1, "2025-10-02T09:00:00", 1, ""),
+        (2, "2025-09-30T09:00:00", 2, ""),
+        (3, "2025-10-07T09:00:00", 4, ""),
+        (4, "2025-09-29T09:00:00", 8, ""),
+    )
+
+    summary = ReportGenerator(temp_storage).get_weekly_summary(datetime(2025, 10, 1))
+
+    assert summary["total_minutes"] == 11
+    assert session_ids(summary["days"]["Monday"]) == [4]
+    assert session_ids(summary["days"]["Tuesday"]) == [2]
+    assert session_ids(summary["days"]["Thursday"]) == [1]
+
+
+def test_productivity_stats_cutoff(temp_storage):
+    """Test that only sessions within the last N days are counted."""
+    now = datetime.now()
+    recent = [now - timedelta(days=6), now - timedelta(days=6, minutes=-5), now - timedelta(hours=1)]
+    add_sessions(
+        temp_storage,
+        (1, (now - timedelta(days=8)).isoformat(), 100, "a1:Old"),
+        (2, recent[0].isoformat(), 30, "b2:One|c3:Two"),
+        (3, recent[1].isoformat(), 10, ""),
+        (4, recent[2].isoformat(), 20, "d4:Three"),
+    )
+
+    stats = ReportGenerator(temp_storage).get_productivity_stats(days=7)
+
+    assert stats["period_days"] == 7
+    assert stats["session_count"] == 3
+    assert stats["total_minutes"] == 60
+    assert stats["total_commits"] == 3
+    assert stats["avg_session_minutes"] == 20
+    assert stats["avg_commits_per_session"] == 1
+    assert stats["active_days"] == len({start.date() for start in recent})
+
+
+def test_productivity_stats_without_sessions(temp_storage):
+    """Test the stats for a period with no sessions."""
+    add_sessions(temp_storage, (1, (datetime.now() - timedelta(days=40)).isoformat(), 100, ""))
+
+    stats = ReportGenerator(temp_storage).get_productivity_stats(days=30)
+
+    assert stats["session_count"] == 0
+    assert stats["total_minutes"] == 0
+    assert stats["active_days"] == 0
+
+
+def test_commit_details_most_recent_wins(temp_storage):
+    """Test that a duplicated session id resolves to the most recently written row."""
+    add_sessions(
+        temp_storage,
+        (1, "2025-09-29T08:00:00", 1, "a1:Old"),
+        (2, "2025-09-29T09:00:00", 1, "b2:Other"),
+        (1, "2025-09-29T10:00:00", 1, "c3:New"),
+    )
+
+    details = ReportGenerator(temp_storage).get_commit_details(1)
+
+    assert details == [{"hash": "c3", "message": "New"}]
+
+
+def test_commit_details_unknown_session(temp_storage):
+    """Test looking up a session that doesn't exist."""
+    add_sessions(temp_storage, (1, "2025-09-29T08:00:00", 1, "a1:Only"))
+
+    assert ReportGenerator(temp_storage).get_commit_details(2) == []
+
+
+def test_commit_details_parsing(temp_storage):
+    """Test that entries without a colon are skipped and colons in messages are kept."""
+    add_sessions(
+        temp_storage,
+        (1, "2025-09-29T08:00:00", 1, " a1 : fix: handle 10:30 | no colon here|b2:Plain"),
+    )
+
+    details = ReportGenerator(temp_storage).get_commit_details(1)
+
+    assert details == [
+        {"hash": "a1", "message": "fix: handle 10:30"},
+        {"hash": "b2", "message": "Plain"},
+    ]
+
+
+def test_invalidate_rereads_storage(temp_storage):
+    """Test that cached reports pick up new sessions after invalidate()."""
+    add_sessions(temp_storage, (1, "2025-09-29T08:00:00", 5, ""))
+    reports = ReportGenerator(temp_storage)
+    assert reports.get_daily_summary(datetime(2025, 9, 29))["session_count"] == 1
+
+    add_sessions(temp_storage, (2, "2025-09-29T09:00:00", 5, ""))
+    assert reports.get_daily_summary(datetime(2025, 9, 29))["session_count"] == 1
+
+    reports.invalidate()
+    assert session_ids(reports.get_daily_summary(datetime(2025, 9, 29))["sessions"]) == [2, 1]
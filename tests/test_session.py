@@ -1,8 +1,10 @@
 """Tests for session management."""
 
+import json
 import tempfile
+import threading
 from pathlib import Path
-from datetime import datetime
+from datetime import datetime, timedelta
 
 import pytest
 
@@ -13,8 +15,7 @@ from timetracking.storage import Storage
 @pytest.fixture
 def session_manager():
     """Create a session manager with temporary storage."""
-    with tempfile.TemporaryDirectory() as tmpdir:
-        storage = Storage(data_dir=Path(tmpdir))
+    with tempfile.TemporaryDirectory() as tmpdir, Storage(data_dir=Path(tmpdir)) as storage:
         manager = SessionManager(storage=storage)
         yield manager
 
@@ -64,11 +65,59 @@ def test_pause_and_resume(session_manager):
     assert paused["paused"] is True
     assert paused["pause_time"]
 
+    # Pretend the pause started 90 seconds ago
+    pause_start = (datetime.now() - timedelta(seconds=90)).isoformat()
+    session_manager.storage.update_active_session(
+        lambda d: d.update(pause_time=pause_start)
+    )
+
     # Resume
     resumed = session_manager.resume_session()
     assert resumed["paused"] is False
     assert resumed["pause_time"] is None
-    assert resumed["total_pause_duration"] > 0
+    assert resumed["total_pause_duration"] >= 90
+    assert isinstance(resumed["total_pause_duration"], int)
+
+
+def write_legacy_session(storage, **fields):
+    """Write an active session file the way older versions did, pause in float minutes."""
+    started = datetime.now() - timedelta(minutes=10)
+    session = {
+        "session_id": 1,
+        "start_time": started.isoformat(),
+        "end_time": "",
+        "duration_minutes": 0,
+        "description": "Legacy work",
+        "commits": "",
+        "notes": "",
+        "paused": False,
+        "pause_time": None,
+        "total_pause_duration": 1.5,
+        **fields,
+    }
+    storage.data_dir.mkdir(parents=True, exist_ok=True)
+    storage.active_session_file.write_text(json.dumps(session))
+
+
+def test_legacy_pause_minutes_are_converted(session_manager):
+    """Test that a float-minutes pause total from an older version is read as seconds."""
+    write_legacy_session(session_manager.storage)
+
+    assert session_manager.storage.load_active_session()["total_pause_duration"] == 90
+    assert 8.4 < session_manager.get_session_status()["elapsed_minutes"] < 8.6
+
+    stopped = session_manager.stop_session()
+    assert 8.4 < stopped["duration_minutes"] < 8.6
+
+
+def test_legacy_pause_minutes_are_converted_on_resume(session_manager):
+    """Test that resuming a legacy paused session adds seconds to seconds."""
+    pause_start = (datetime.now() - timedelta(seconds=30)).isoformat()
+    write_legacy_session(session_manager.storage, paused=True, pause_time=pause_start)
+
+    resumed = session_manager.resume_session()
+    assert isinstance(resumed["total_pause_duration"], int)
+    assert 120 <= resumed["total_pause_duration"] < 125
 
 
 def test_add_note(session_manager):
@@ -127,4 +176,96 @@ def test_get_session_status_with_commits(session_manager):
     session_manager.add_commit("def456", "Commit 2")
 
     status = session_manager.get_session_status()
-    assert status["commit_count"] == 2
\ No newline at end of file
+    assert status["commit_count"] == 2
+
+
+def test_stop_session_includes_commits(session_manager):
+    """Test that logged commits are saved with the stopped session."""
+    session_manager.start_session("Test work")
+    session_manager.add_commit("abc123", "Subject\n\nBody line")
+    session_manager.add_commit("def456", "Second commit")
+
+    stopped = session_manager.stop_session()
+    assert stopped["commits"] == "abc123:Subject\n\nBody line|def456:Second commit"
+    assert not session_manager.storage.active_commits_file.exists()
+
+    sessions = session_manager.storage.get_sessions()
+    assert sessions[0]["commits"] == stopped["commits"]
+
+
+
+def test_add_commit_during_stop_is_not_lost(session_manager, monkeypatch):
+    """Test that a commit racing a stop isn't reported as recorded and then deleted."""
+    session_manager.start_session("Test work")
+    session_manager.add_commit("a1", "first")
+    hook = SessionManager(storage=Storage(data_dir=session_manager.storage.data_dir))
+    syncing, release = threading.Event(), threading.Event()
+    real_sync = session_manager.storage.sync
+
+    def slow_sync():
+        syncing.set()
+        release.wait(5)
+        real_sync()
+
+    monkeypatch.setattr(session_manager.storage, "sync", slow_sync)
+    stopper = threading.Thread(target=session_manager.stop_session)
+    stopper.start()
+    assert syncing.wait(5)
+
+    recorded = []
+    committer = threading.Thread(target=lambda: recorded.append(hook.add_commit("b2", "second")))
+    committer.start()
+    committer.join(0.2)
+    assert committer.is_alive()  # Blocked until the stop is done
+
+    release.set()
+    stopper.join(5)
+    committer.join(5)
+
+    assert recorded == [None]
+    assert session_manager.storage.get_sessions()[0]["commits"] == "a1:first"
+    assert not session_manager.storage.active_commits_file.exists()
+
+def test_only_stop_session_fsyncs(session_manager, monkeypatch):
+    """Test that active session writes skip fsync and stopping syncs once."""
+    synced = []
+    monkeypatch.setattr("os.fsync", synced.append)
+
+    session_manager.start_session("Test work")
+    for i in range(100):
+        session_manager.add_note(f"note {i}")
+        session_manager.add_commit(f"abc{i}", "Commit")
+    session_manager.pause_session()
+    session_manager.resume_session()
+    assert synced == []
+
+    session_manager.stop_session()
+    assert len(synced) == 2  # The CSV and its directory
+
+
+def test_stop_session_waits_for_concurrent_update(session_manager):
+    """Test that a note racing a stop can't write the stopped session back."""
+    session_manager.start_session("Test work")
+    other = Storage(data_dir=session_manager.storage.data_dir)
+    reading, release = threading.Event(), threading.Event()
+
+    def slow_note(active: dict):
+        reading.set()
+        release.wait(5)
+        active["notes"] = "late note"
+
+    updater = threading.Thread(target=other.update_active_session, args=(slow_note,))
+    updater.start()
+    assert reading.wait(5)
+
+    stopper = threading.Thread(target=session_manager.stop_session)
+    stopper.start()
+    stopper.join(0.2)
+    assert stopper.is_alive()  # Blocked on the lock the update holds
+
+    release.set()
+    updater.join(5)
+    stopper.join(5)
+
+    assert not session_manager.storage.active_session_file.exists()
+    assert session_manager.storage.get_sessions()[0]["notes"] == "late note"
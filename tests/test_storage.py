@@ -1,6 +1,11 @@
 """Tests for storage layer."""
 
+import csv
+import io
+import json
+import os
 import tempfile
+import tracemalloc
 from pathlib import Path
 
 import pytest
@@ -11,16 +16,30 @@ from timetracking.storage import Storage
 @pytest.fixture
 def temp_storage():
     """Create a temporary storage instance."""
-    with tempfile.TemporaryDirectory() as tmpdir:
-        storage = Storage(data_dir=Path(tmpdir))
+    with tempfile.TemporaryDirectory() as tmpdir, Storage(data_dir=Path(tmpdir)) as storage:
         yield storage
 
 
 def test_storage_initialization(temp_storage):
     """Test that storage initializes correctly."""
-    assert temp_storage.data_dir.exists()
-    assert temp_storage.csv_file.exists()
+    assert not temp_storage.csv_file.exists()
     assert not temp_storage.active_session_file.exists()
+    assert temp_storage.get_sessions() == []
+
+
+def test_storage_creates_files_on_first_write():
+    """Test that the data directory and CSV header are created lazily."""
+    with tempfile.TemporaryDirectory() as tmpdir, Storage(data_dir=Path(tmpdir) / "nested") as storage:
+        assert not storage.data_dir.exists()
+
+        storage.append_session_to_csv({"session_id": 1, "start_time": "2025-09-30T10:00:00"})
+        storage.flush()
+
+        header = io.StringIO()
+        csv.writer(header).writerow(["session_id", "start_time", "end_time", "duration_minutes",
+                                     "description", "commits", "notes"])
+        assert storage.csv_file.read_bytes().startswith(header.getvalue().encode())
+        assert len(storage.get_sessions()) == 1
 
 
 def test_save_and_load_active_session(temp_storage):
@@ -39,6 +58,57 @@ def test_save_and_load_active_session(temp_storage):
     assert loaded["description"] == "Test session"
 
 
+def test_active_session_written_compactly(temp_storage):
+    """Test that the active session is stored as compact JSON."""
+    temp_storage.save_active_session({"session_id": 1, "notes": "a\nb"})
+
+    assert temp_storage.active_session_file.read_text() == '{"session_id":1,"notes":"a\\nb"}'
+
+
+@pytest.mark.parametrize("use_orjson", [True, False])
+def test_active_session_json_backends(temp_storage, monkeypatch, use_orjson):
+    """Test the active session round-trips with and without orjson."""
+    if use_orjson:
+        orjson = pytest.importorskip("orjson")
+        monkeypatch.setattr("timetracking.storage.orjson", orjson)
+        monkeypatch.setattr("timetracking.storage._loads", orjson.loads)
+    else:
+        monkeypatch.setattr("timetracking.storage.orjson", None)
+        monkeypatch.setattr("timetracking.storage._loads", json.loads)
+
+    session_data = {"session_id": 1, "description": "Caf\u00e9 \u2615", "total_pause_duration": 90}
+    temp_storage.save_active_session(session_data)
+    assert temp_storage.load_active_session() == session_data
+
+    temp_storage.active_session_file.write_text("{not json")
+    assert temp_storage.load_active_session() is None
+
+
+def test_save_active_session_is_atomic(temp_storage, monkeypatch):
+    """Test that a failed write leaves the previous active session loadable."""
+    temp_storage.save_active_session({"session_id": 1, "description": "Original"})
+
+    def crash(*args, **kwargs):
+        raise OSError("simulated crash")
+
+    monkeypatch.setattr("os.replace", crash)
+    with pytest.raises(OSError):
+        temp_storage.save_active_session({"session_id": 1, "description": "Updated"})
+
+    assert temp_storage.load_active_session()["description"] == "Original"
+
+
+def test_save_active_session_writes_immediately(temp_storage):
+    """Test that each save is on disk as soon as it returns."""
+    other = Storage(data_dir=temp_storage.data_dir)
+    for i in range(3):
+        temp_storage.save_active_session({"session_id": 1, "notes": f"note {i}"})
+        assert other.load_active_session()["notes"] == f"note {i}"
+
+    temp_storage.clear_active_session()
+    assert not other.has_active_session()
+
+
 def test_clear_active_session(temp_storage):
     """Test clearing active session."""
     session_data = {"session_id": 1, "description": "Test"}
@@ -50,6 +120,54 @@ def test_clear_active_session(temp_storage):
     assert temp_storage.load_active_session() is None
 
 
+def test_has_active_session(temp_storage):
+    """Test checking for an active session."""
+    assert temp_storage.has_active_session() is False
+
+    temp_storage.save_active_session({"session_id": 1})
+    assert temp_storage.has_active_session() is True
+
+    temp_storage.clear_active_session()
+    assert temp_storage.has_active_session() is False
+
+
+def test_active_commits_log(temp_storage):
+    """Test appending and loading commits for the active session."""
+    assert temp_storage.load_active_commits() == []
+
+    temp_storage.append_active_commit("abc123:First")
+    temp_storage.append_active_commit("def456:Multi\nline")
+    assert temp_storage.load_active_commits() == ["abc123:First", "def456:Multi\nline"]
+
+    temp_storage.clear_active_session()
+    assert temp_storage.load_active_commits() == []
+
+
+def test_update_active_session(temp_storage):
+    """Test updating the active session in a single read-modify-write."""
+    assert temp_storage.update_active_session(lambda d: d.update(notes="x")) is None
+
+    temp_storage.save_active_session({"session_id": 1, "notes": ""})
+    updated = temp_storage.update_active_session(lambda d: d.update(notes="x"))
+
+    assert updated["notes"] == "x"
+    assert temp_storage.load_active_session()["notes"] == "x"
+
+
+def test_update_active_session_error_leaves_file(temp_storage):
+    """Test that a failing update doesn't modify the active session."""
+    temp_storage.save_active_session({"session_id": 1, "notes": "keep"})
+
+    def fail(session_data):
+        session_data["notes"] = "changed"
+        raise ValueError("nope")
+
+    with pytest.raises(ValueError):
+        temp_storage.update_active_session(fail)
+
+    assert temp_storage.load_active_session()["notes"] == "keep"
+
+
 def test_append_session_to_csv(temp_storage):
     """Test appending session to CSV."""
     session_data = {
@@ -108,4 +226,366 @@ def test_get_sessions_with_limit(temp_storage):
     assert len(all_sessions) == 5
 
     limited = temp_storage.get_sessions(limit=3)
-    assert len(limited) == 3
\ No newline at end of file
+    assert len(limited) == 3
+
+
+def test_get_sessions_coerces_duration(temp_storage):
+    """Test that durations are returned as floats."""
+    for session_id, duration in [(1, 60), (2, "")]:
+        temp_storage.append_session_to_csv({
+            "session_id": session_id,
+            "start_time": "2025-09-30T10:00:00",
+            "duration_minutes": duration,
+        })
+
+    sessions = temp_storage.get_sessions()
+
+    assert sessions[0]["duration_minutes"] == 0.0
+    assert sessions[1]["duration_minutes"] == 60.0
+
+
+def test_get_sessions_skips_malformed_start_time(temp_storage):
+    """Test that rows with an unparseable start time are skipped."""
+    temp_storage.append_session_to_csv({"session_id": 1, "start_time": "2025-09-30T10:00:00"})
+    temp_storage.append_session_to_csv({"session_id": 2, "start_time": "garbage"})
+
+    sessions = temp_storage.get_sessions()
+
+    assert [s["session_id"] for s in sessions] == ["1"]
+    # The skipped row's id is still taken
+    assert temp_storage.get_next_session_id() == 3
+
+
+def test_update_session_in_csv_last_row(temp_storage):
+    """Test updating the last row rewrites only the tail of the file."""
+    for i in range(1000):
+        temp_storage.append_session_to_csv({
+            "session_id": i + 1,
+            "start_time": "2025-09-30T10:00:00",
+            "duration_minutes": 60,
+            "notes": "line one\nline two, \"quoted\"" if i == 999 else "",
+        })
+    temp_storage.flush()
+    before = temp_storage.csv_file.read_bytes()
+
+    temp_storage.update_session_in_csv({
+        "session_id": 1000,
+        "start_time": "2025-09-30T10:00:00",
+        "duration_minutes": 90,
+        "notes": "updated",
+    })
+    after = temp_storage.csv_file.read_bytes()
+
+    # Everything before the last row is untouched
+    head = before[:before.rindex(b"\r\n1000,") + 2]
+    assert after.startswith(head)
+    assert after[len(head):] == b"1000,2025-09-30T10:00:00,,90,,,updated\r\n"
+
+    sessions = temp_storage.get_sessions()
+    assert len(sessions) == 1000
+    assert sessions[0]["notes"] == "updated"
+
+
+def test_update_session_in_csv_earlier_row(temp_storage):
+    """Test updating a row other than the last one."""
+    for i in range(3):
+        temp_storage.append_session_to_csv({
+            "session_id": i + 1,
+            "start_time": "2025-09-30T10:00:00",
+            "description": f"Session {i + 1}",
+        })
+
+    temp_storage.update_session_in_csv({
+        "session_id": 2,
+        "start_time": "2025-09-30T10:00:00",
+        "description": "Updated",
+    })
+
+    sessions = temp_storage.get_sessions()
+    assert [s["description"] for s in sessions] == ["Session 3", "Updated", "Session 1"]
+
+
+def test_update_session_in_csv_recent_rows_in_place(temp_storage):
+    """Test that recent rows are rewritten in place and older ones still update."""
+    for i in range(100):
+        temp_storage.append_session_to_csv({
+            "session_id": i + 1,
+            "start_time": "2025-09-30T10:00:00",
+            "notes": "multi\nline" if i % 2 else "",
+        })
+    temp_storage.flush()
+    before = temp_storage.csv_file.read_bytes()
+
+    temp_storage.update_session_in_csv({"session_id": 90, "start_time": "2025-09-30T10:00:00", "notes": "Updated"})
+    after = temp_storage.csv_file.read_bytes()
+    head = before[:before.index(b"\r\n90,") + 2]
+    assert after.startswith(head)
+    assert after[len(head):].startswith(b"90,2025-09-30T10:00:00,,0,,,Updated\r\n91,")
+    assert after.endswith(before[before.index(b"\r\n91,") + 2:])
+
+    temp_storage.update_session_in_csv({"session_id": 10, "start_time": "2025-09-30T10:00:00", "notes": "Old"})
+
+    sessions = temp_storage.get_sessions()
+    assert len(sessions) == 100
+    assert sessions[10]["notes"] == "Updated"
+    assert sessions[90]["notes"] == "Old"
+    assert sessions[8]["notes"] == "multi\nline"
+
+
+def test_get_next_session_id_is_cached(temp_storage, monkeypatch):
+    """Test that the next ID is tracked without rescanning the CSV."""
+    for i in range(3):
+        temp_storage.append_session_to_csv({"session_id": i + 1, "start_time": "2025-09-30T10:00:00"})
+    temp_storage.flush()
+    assert Storage(data_dir=temp_storage.data_dir).get_next_session_id() == 4
+
+    def fail(*args, **kwargs):
+        raise AssertionError("CSV should not be read")
+
+    monkeypatch.setattr(temp_storage, "get_sessions", fail)
+    monkeypatch.setattr(temp_storage, "_read_next_session_id", fail)
+
+    assert temp_storage.get_next_session_id() == 4
+    temp_storage.append_session_to_csv({"session_id": 4, "start_time": "2025-09-30T10:00:00"})
+    assert temp_storage.get_next_session_id() == 5
+
+    # An out-of-order append from a Storage that hasn't read the CSV yet
+    monkeypatch.undo()
+    temp_storage.append_sessions(
+        {"session_id": i, "start_time": "2025-09-30T10:00:00"} for i in range(5, 11)
+    )
+    temp_storage.flush()
+    fresh = Storage(data_dir=temp_storage.data_dir)
+    fresh.append_session_to_csv({"session_id": 3, "start_time": "2025-09-30T10:00:00"})
+    assert fresh.get_next_session_id() == 11
+
+
+def test_append_session_to_csv_buffers_writes(temp_storage, monkeypatch):
+    """Test that appended rows share one file handle and are written on flush."""
+    temp_storage.append_session_to_csv({"session_id": 1, "start_time": "2025-09-30T10:00:00"})
+    temp_storage.close()
+
+    opens = []
+    real_open = open
+
+    def counting_open(*args, **kwargs):
+        opens.append(args[0])
+        return real_open(*args, **kwargs)
+
+    monkeypatch.setattr("builtins.open", counting_open)
+    for i in range(2, 10002):
+        temp_storage.append_session_to_csv({"session_id": i, "start_time": "2025-09-30T10:00:00"})
+    temp_storage.flush()
+    monkeypatch.undo()
+
+    assert len(opens) == 1
+    sessions = temp_storage.get_sessions()
+    assert len(sessions) == 10001
+    assert sessions[0]["session_id"] == "10001"
+
+
+def test_get_sessions_limit_reads_from_tail(temp_storage):
+    """Test that limited reads match the full read, including skipped rows."""
+    for i in range(200):
+        temp_storage.append_session_to_csv({
+            "session_id": i + 1,
+            "start_time": "not a date" if i in (195, 197) else "2025-09-30T10:00:00",
+            "notes": "multi\nline, \"quoted\"" if i % 3 == 0 else "",
+        })
+
+    all_sessions = temp_storage.get_sessions()
+    assert len(all_sessions) == 198
+    for limit in (1, 3, 4, 10, 198, 500):
+        assert temp_storage.get_sessions(limit=limit) == all_sessions[:limit]
+
+
+def test_append_session_to_csv_fills_missing_fields(temp_storage):
+    """Test that fields missing from the session are written with defaults."""
+    temp_storage.append_session_to_csv({"session_id": 1, "start_time": "2025-09-30T10:00:00"})
+    temp_storage.flush()
+
+    assert temp_storage.csv_file.read_text().splitlines()[1] == "1,2025-09-30T10:00:00,,0,,,"
+
+
+def test_append_sessions(temp_storage):
+    """Test that appending many sessions writes every row in a single call."""
+    temp_storage.append_session_to_csv({"session_id": 1, "start_time": "2025-09-30T10:00:00"})
+    temp_storage.flush()
+
+    writes = []
+
+    class RecordingFile:
+        def __init__(self, f):
+            self.f = f
+
+        def write(self, data):
+            writes.append(data)
+            return self.f.write(data)
+
+        def __getattr__(self, name):
+            return getattr(self.f, name)
+
+    temp_storage._appender._fh = RecordingFile(temp_storage._appender._fh)
+    temp_storage.append_sessions([
+        {"session_id": i, "start_time": "2025-09-30T10:00:00", "notes": f"note {i}"}
+        for i in range(2, 2002)
+    ])
+
+    assert len(writes) == 1
+    sessions = temp_storage.get_sessions()
+    assert len(sessions) == 2001
+    assert sessions[0]["notes"] == "note 2001"
+    assert temp_storage.get_next_session_id() == 2002
+
+
+def test_append_sessions_matches_single_appends(monkeypatch):
+    """Test that batched and one-at-a-time appends write the same file."""
+    sessions = [
+        {"session_id": i, "start_time": "2025-09-30T10:00:00", "notes": f"note, {i}"}
+        for i in range(1, 10001)
+    ]
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        single_dir, batch_dir = Path(tmpdir) / "single", Path(tmpdir) / "batch"
+        with Storage(data_dir=single_dir) as storage:
+            for session in sessions:
+                storage.append_session_to_csv(session)
+
+        opens = []
+        real_open = open
+
+        def counting_open(*args, **kwargs):
+            opens.append(args[0])
+            return real_open(*args, **kwargs)
+
+        monkeypatch.setattr("builtins.open", counting_open)
+        with Storage(data_dir=batch_dir) as storage:
+            storage.append_sessions(sessions)
+        monkeypatch.undo()
+
+        # One open to create the CSV with its header, one to append the rows
+        assert len(opens) == 2
+        assert (batch_dir / "sessions.csv").read_bytes() == (single_dir / "sessions.csv").read_bytes()
+
+
+def test_get_next_session_id_scans_large_csv(temp_storage):
+    """Test the full id scan used when the last row's id isn't a number."""
+    sessions = [{"session_id": i, "start_time": "2025-09-30T10:00:00"} for i in range(1, 50001)]
+    sessions[1234]["session_id"] = 99999
+    sessions.append({"session_id": "bad", "start_time": "2025-09-30T10:00:00"})
+    temp_storage.append_sessions(sessions)
+
+    assert Storage(data_dir=temp_storage.data_dir).get_next_session_id() == 100000
+
+
+def test_get_session_columns(temp_storage):
+    """Test columnar reads match get_sessions()."""
+    assert temp_storage.get_session_columns()["session_id"] == []
+
+    for i in range(5):
+        temp_storage.append_session_to_csv({
+            "session_id": i + 1,
+            "start_time": "bad" if i == 2 else f"2025-09-30T1{i}:00:00",
+            "duration_minutes": "oops" if i == 4 else 30 * i,
+            "commits": "abc:msg" if i else "",
+        })
+
+    columns = temp_storage.get_session_columns()
+    assert columns["session_id"] == ["1", "2", "4", "5"]
+    assert columns["duration_minutes"] == [0.0, 30.0, 90.0, 0.0]
+    assert columns["commits"] == ["", "abc:msg", "abc:msg", "abc:msg"]
+
+    sessions = temp_storage.get_sessions()[::-1]
+    assert [s["duration_minutes"] for s in sessions] == columns["duration_minutes"]
+
+
+def test_update_session_in_csv_streams_rewrite(temp_storage):
+    """Test that rewriting an old row doesn't hold the whole file in memory."""
+    temp_storage.append_sessions([
+        {"session_id": i, "start_time": "2025-09-30T10:00:00", "description": f"Session {i}"}
+        for i in range(1, 100001)
+    ])
+    size = temp_storage.csv_file.stat().st_size
+
+    tracemalloc.start()
+    temp_storage.update_session_in_csv({
+        "session_id": 5,
+        "start_time": "2025-09-30T10:00:00",
+        "description": "Updated",
+    })
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    assert peak < 1024 * 1024 < size
+    temp_storage.append_session_to_csv({"session_id": 100001, "start_time": "2025-09-30T10:00:00"})
+    sessions = temp_storage.get_sessions()
+    assert len(sessions) == 100001
+    assert sessions[-5]["description"] == "Updated"
+    assert sessions[-6]["description"] == "Session 6"
+    assert list(temp_storage.data_dir.glob("*.tmp")) == []
+
+
+def test_first_write_keeps_existing_csv(temp_storage):
+    """Test that a new Storage appends to an existing CSV instead of recreating it."""
+    temp_storage.append_session_to_csv({"session_id": 1, "start_time": "2025-09-30T10:00:00"})
+    temp_storage.close()
+
+    with Storage(data_dir=temp_storage.data_dir) as storage:
+        storage.append_session_to_csv({"session_id": 2, "start_time": "2025-09-30T11:00:00"})
+
+    assert [s["session_id"] for s in temp_storage.get_sessions()] == ["2", "1"]
+
+
+def test_tail_reads_handle_empty_csv(temp_storage):
+    """Test the memory-mapped tail reads on a zero-length CSV file."""
+    temp_storage.data_dir.mkdir(exist_ok=True)
+    temp_storage.csv_file.touch()
+
+    assert temp_storage.get_sessions(limit=5) == []
+    assert temp_storage.get_next_session_id() == 1
+
+
+def test_get_sessions_large_unquoted_csv(temp_storage):
+    """Test that large files without quotes parse the same as through csv.reader."""
+    temp_storage.append_sessions([
+        {
+            "session_id": i,
+            "start_time": "bad" if i == 7 else "2025-09-30T10:00:00",
+            "duration_minutes": 1.5,
+            "description": f"Session {i}",
+            "commits": "abc:Fix|def:Add" if i % 2 else "",
+        }
+        for i in range(1, 30001)
+    ])
+    text = temp_storage.csv_file.read_text()
+    assert len(text) > 1 << 20 and '"' not in text
+
+    expected = [row for row in csv.reader(io.StringIO(text, newline="")) if row]
+    sessions = temp_storage.get_sessions()
+    assert [list(s.values()) for s in sessions[:2]] == [
+        ["30000", "2025-09-30T10:00:00", "", 1.5, "Session 30000", "", ""],
+        ["29999", "2025-09-30T10:00:00", "", 1.5, "Session 29999", "abc:Fix|def:Add", ""],
+    ]
+    assert [s["session_id"] for s in sessions[::-1]] == [row[0] for row in expected[1:] if row[0] != "7"]
+    assert temp_storage.get_session_columns()["commits"][:2] == ["abc:Fix|def:Add", ""]
+
+
+def test_get_sessions_columns(temp_storage):
+    """Test that projected reads match the matching fields of full reads."""
+    for i in range(20):
+        temp_storage.append_session_to_csv({
+            "session_id": i + 1,
+            "start_time": "bad" if i == 15 else "2025-09-30T10:00:00",
+            "duration_minutes": 1.5 * i,
+            "notes": "multi\nline" if i % 4 == 0 else "",
+        })
+
+    columns = ["session_id", "duration_minutes", "notes"]
+    for limit in (None, 3, 10):
+        full = temp_storage.get_sessions(limit=limit)
+        projected = temp_storage.get_sessions(limit=limit, columns=columns)
+        assert projected == [{column: s[column] for column in columns} for s in full]
+
+    assert temp_storage.get_sessions(limit=1, columns=["description"]) == [{"description": ""}]
+    with pytest.raises(ValueError):
+        temp_storage.get_sessions(columns=["missing"])